@@ -1,40 +1,94 @@
-from typing import Optional, List, Dict, Any
+import os
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Set
 import requests
-from pydantic import BaseModel
-from .utils import ErrorHandler, IQServerError, logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .utils import F, ErrorHandler, IQServerError, json_loads, logger
 
+try:
+    import zstandard as zstd
+except ImportError:  # pragma: no cover - zstandard is a declared dependency
+    zstd = None  # type: ignore[assignment]
 
-# Simplified models - only what we actually need
-class Application(BaseModel):
+
+# Simplified models - only what we actually need. These are plain
+# containers filled from IQ Server responses, so they skip pydantic validation.
+@dataclass(slots=True)
+class Application:
     id: str
     publicId: str
     name: str
 
-    class Config:
-        extra = "allow"
-
 
-class ReportInfo(BaseModel):
+@dataclass(slots=True)
+class ReportInfo:
     reportId: Optional[str] = None
     scanId: Optional[str] = None
     reportDataUrl: Optional[str] = None
 
-    class Config:
-        extra = "allow"
+
+def memoize(func: F) -> F:
+    """Memoize successful results per client instance; failures are retried."""
+
+    @wraps(func)
+    def wrapper(self: "IQServerClient", *args: Any, **kwargs: Any) -> Any:
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        if key in self._memo:
+            return self._memo[key]
+        result = func(self, *args, **kwargs)
+        if result is not None:
+            self._memo[key] = result
+        return result
+
+    return wrapper  # type: ignore[return-value]
 
 
 class IQServerClient:
     """Simple IQ Server API client with error handling built-in."""
 
-    def __init__(self, url: str, user: str, pwd: str) -> None:
+    # (connect, read) seconds; a stalled socket would otherwise pin a worker
+    TIMEOUT = (10, 30)
+
+    def __init__(
+        self,
+        url: str,
+        user: str,
+        pwd: str,
+        cache_dir: Optional[Path] = None,
+        pool_size: int = 32,
+    ) -> None:
         self.base_url = url.rstrip("/")
+        self._memo: Dict[Any, Any] = {}
+        self.cache_dir = cache_dir
+        self._cache_used: Set[Path] = set()
+        if cache_dir:
+            cache_dir.mkdir(parents=True, exist_ok=True)
         self.session = requests.Session()
         self.session.auth = (user, pwd)
         self.session.headers.update({"Accept": "application/json"})
+        # Keep one pooled connection per fetch worker so none are discarded when
+        # the pool overflows, and retry transient errors; 429 retries honour the
+        # server's Retry-After header
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _request(self, method: str, endpoint: str, **kwargs: Any) -> requests.Response:
         """Make HTTP requests with error handling."""
         url = f"{self.base_url}{endpoint}"
+        kwargs.setdefault("timeout", self.TIMEOUT)
         try:
             r = self.session.request(method, url, **kwargs)
             r.raise_for_status()
@@ -43,11 +97,26 @@ class IQServerClient:
             logger.error(f"{method} {endpoint} failed: {e}")
             raise IQServerError(f"{method} {endpoint} failed: {e}")
 
+    def _cache_file(self, public_id: str, report_id: str) -> Optional[Path]:
+        """Return the on-disk cache location for a report, if caching is enabled."""
+        if not self.cache_dir:
+            return None
+        suffix = ".json.zst" if zstd is not None else ".json"
+        return self.cache_dir / f"{public_id}_{report_id}{suffix}"
+
+    def _load_cache(self, cache_file: Path) -> Any:
+        """Read and parse a cached report body."""
+        raw = cache_file.read_bytes()
+        if zstd is not None:
+            raw = zstd.ZstdDecompressor().decompress(raw)
+        return json_loads(raw)
+
+    @memoize
     @ErrorHandler.handle_api_error
     def get_applications(
         self, org_id: Optional[str] = None
     ) -> Optional[List[Application]]:
-        """Fetch all applications and return as validated models."""
+        """Fetch all applications as lightweight models."""
         ep = (
             f"/api/v2/applications/organization/{org_id}"
             if org_id
@@ -55,22 +124,110 @@ class IQServerClient:
         )
         response = self._request("GET", ep)
         apps_data = response.json().get("applications", [])
-        return [Application(**app) for app in apps_data]
+        return [
+            Application(id=app["id"], publicId=app["publicId"], name=app["name"])
+            for app in apps_data
+        ]
 
+    @memoize
     @ErrorHandler.handle_api_error
     def get_latest_report_info(self, app_id: str) -> Optional[ReportInfo]:
         """Get the latest report info for an application."""
         response = self._request("GET", f"/api/v2/reports/applications/{app_id}")
         reports = response.json()
-        return ReportInfo(**reports[0]) if reports else None
+        if not reports:
+            return None
+        latest = reports[0]
+        return ReportInfo(
+            reportId=latest.get("reportId"),
+            scanId=latest.get("scanId"),
+            reportDataUrl=latest.get("reportDataUrl"),
+        )
+
+    def _store_cache(self, cache_file: Path, body: bytes, etag: Optional[str]) -> None:
+        """Persist a report body and its ETag (if any) to the cache."""
+        # Write then rename so an interrupted run never leaves a partial entry
+        if zstd is not None:
+            # Compressor objects are not thread-safe, so use one per write
+            body = zstd.ZstdCompressor(level=3).compress(body)
+        tmp_file = cache_file.with_suffix(".tmp")
+        tmp_file.write_bytes(body)
+        os.replace(tmp_file, cache_file)
+        etag_file = cache_file.with_suffix(".etag")
+        if etag:
+            etag_file.write_text(etag, encoding="utf-8")
+        else:
+            etag_file.unlink(missing_ok=True)
+
+    def _discard_cache(self, cache_file: Path, error: Exception) -> None:
+        """Drop an unreadable cache entry so the report is downloaded again."""
+        logger.warning(
+            f"⚠️  Discarding unreadable cached report {cache_file.name}: {error}"
+        )
+        try:
+            cache_file.unlink(missing_ok=True)
+            cache_file.with_suffix(".etag").unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def prune_cache(self) -> int:
+        """Delete cache entries not used by this client, returning how many."""
+        if not self.cache_dir:
+            return 0
+        keep = set(self._cache_used)
+        keep.update(f.with_suffix(".etag") for f in self._cache_used)
+        removed = 0
+        for path in self.cache_dir.iterdir():
+            if path in keep:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning(
+                    f"⚠️  Could not remove stale cache entry {path.name}: {e}"
+                )
+        return removed
 
     @ErrorHandler.handle_api_error
     def get_policy_violations(
         self, public_id: str, report_id: str
     ) -> Optional[Dict[str, Any]]:
-        """Fetch raw report data."""
-        response = self._request(
-            "GET",
-            f"/api/v2/applications/{public_id}/reports/{report_id}/policy?includeViolationTimes=true",
-        )
-        return response.json()
+        """Fetch raw report data, reusing the on-disk cache when available.
+
+        Cached bodies are revalidated with ``If-None-Match`` when the server sent
+        an ETag; otherwise they are served as-is since report IDs are immutable.
+        The cache is only an optimisation: unreadable entries are refetched and
+        failed writes are logged, never failing the report itself.
+        """
+        endpoint = f"/api/v2/applications/{public_id}/reports/{report_id}/policy?includeViolationTimes=true"
+        cache_file = self._cache_file(public_id, report_id)
+        if cache_file:
+            self._cache_used.add(cache_file)
+        headers: Dict[str, str] = {}
+        if cache_file and cache_file.exists():
+            etag_file = cache_file.with_suffix(".etag")
+            try:
+                if not etag_file.exists():
+                    logger.debug(f"Using cached report {cache_file.name}")
+                    return self._load_cache(cache_file)
+                headers["If-None-Match"] = etag_file.read_text(encoding="utf-8")
+            except Exception as e:
+                self._discard_cache(cache_file, e)
+
+        response = self._request("GET", endpoint, headers=headers)
+        if cache_file and response.status_code == 304:
+            logger.debug(f"Cached report {cache_file.name} is still current")
+            try:
+                return self._load_cache(cache_file)
+            except Exception as e:
+                self._discard_cache(cache_file, e)
+                response = self._request("GET", endpoint)
+        if cache_file:
+            try:
+                self._store_cache(
+                    cache_file, response.content, response.headers.get("ETag")
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  Could not cache report {cache_file.name}: {e}")
+        return json_loads(response.content)
@@ -8,6 +8,10 @@ from .utils import resolve_path
 load_dotenv(dotenv_path=resolve_path("config/.env"))
 
 
+# Upper bound for FETCH_WORKERS; more parallel fetches mostly get throttled
+MAX_FETCH_WORKERS = 64
+
+
 class Config(BaseModel):
     """
     Configuration for connecting to the IQ Server and output settings.
@@ -18,6 +22,7 @@ class Config(BaseModel):
     iq_password: str
     organization_id: Optional[str] = None
     output_dir: str = "raw_reports"
+    fetch_workers: int = 16
 
     @field_validator("iq_username", "iq_password")
     @classmethod
@@ -26,6 +31,15 @@ class Config(BaseModel):
             raise ValueError(f"{info.field_name} must not be empty")
         return str(v)
 
+    @field_validator("fetch_workers")
+    @classmethod
+    def within_worker_limits(cls, v: int, info: ValidationInfo) -> int:
+        if not 1 <= v <= MAX_FETCH_WORKERS:
+            raise ValueError(
+                f"{info.field_name} must be between 1 and {MAX_FETCH_WORKERS}"
+            )
+        return v
+
     @classmethod
     def from_env(cls) -> "Config":
         """
@@ -36,6 +50,7 @@ class Config(BaseModel):
         pwd = os.getenv("IQ_PASSWORD", "")
         org = os.getenv("ORGANIZATION_ID")
         out = os.getenv("OUTPUT_DIR", "raw_reports")
+        workers = os.getenv("FETCH_WORKERS") or "16"
 
         # Let Pydantic handle all validation
         return cls(
@@ -44,4 +59,5 @@ class Config(BaseModel):
             iq_password=pwd,
             organization_id=org,
             output_dir=out,
+            fetch_workers=workers,  # type: ignore[arg-type]
         )
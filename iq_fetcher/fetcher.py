@@ -1,24 +1,91 @@
+import csv
+import os
 import re
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from itertools import batched
 from pathlib import Path
-import pandas as pd
-import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Deque, Iterable, Iterator, Tuple
 
 from .client import IQServerClient, Application, ReportInfo
 from .config import Config
 from .utils import logger, resolve_path
 
+_CVE_RE = re.compile(r"CVE-\d{4}-\d+")
+
+CSV_FIELDS = [
+    "No.",
+    "Application",
+    "Organization",
+    "time",
+    "Critical (7-10)",
+    "Severe (4-6)",
+    "Moderate (1-3)",
+    "Policy",
+    "Component",
+    "Threat",
+    "Policy/Action",
+    "Constraint Name",
+    "Condition",
+    "CVE",
+]
+
+# Labels indexed by threat level (0-10), replacing per-row if/elif ladders
+_SEV_BY_LEVEL = ("Low",) + ("Moderate",) * 3 + ("Severe",) * 3 + ("Critical",) * 4
+_SEC_ACTION_BY_LEVEL = (
+    ("Security-Moderate",) * 4
+    + ("Security-CVSS score than or equals 7",) * 3
+    + ("Security-Critical",) * 4
+)
+
+
+def _threat_index(threat_level: Any) -> int:
+    """Clamp a policy threat level into a 0-10 lookup table index."""
+    level = int(threat_level)
+    return level if 0 <= level <= 10 else (0 if level < 0 else 10)
+
+
+def extract_cve_info(constraints: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Summarize CVE IDs, conditions and constraint name for a violation."""
+    if not constraints:
+        return {"cve_id": "", "condition": "", "constraint_name": ""}
+    # Only the last constraint ends up in the row, so skip the earlier ones
+    constraint = constraints[-1]
+    cve_ids: Dict[str, None] = {}  # insertion-ordered set
+    condition_parts = []
+    for condition in constraint.get("conditions", []):
+        condition_summary = condition.get("conditionSummary", "")
+        condition_reason = condition.get("conditionReason", "")
+        cve_match = _CVE_RE.search(condition_summary) or _CVE_RE.search(
+            condition_reason
+        )
+        if cve_match:
+            cve_ids[cve_match.group(0)] = None
+        part = condition_reason or condition_summary
+        if part:
+            condition_parts.append(part)
+    return {
+        "cve_id": ", ".join(cve_ids),
+        "condition": " | ".join(condition_parts),
+        "constraint_name": constraint.get("constraintName", ""),
+    }
+
 
 class RawReportFetcher:
     """🎯 Fetches and saves IQ Server reports as CSV files and consolidates them."""
 
     def __init__(self, config: Config) -> None:
         self.config = config
-        self.iq = IQServerClient(
-            str(config.iq_server_url), config.iq_username, config.iq_password
-        )
         self.output_path = Path(resolve_path(config.output_dir))
         self.output_path.mkdir(parents=True, exist_ok=True)
+        self.iq = IQServerClient(
+            str(config.iq_server_url),
+            config.iq_username,
+            config.iq_password,
+            cache_dir=self.output_path / ".cache",
+            pool_size=config.fetch_workers,
+        )
 
     def _extract_report_id(self, info: ReportInfo) -> Optional[str]:
         """Extract report ID from report info."""
@@ -31,10 +98,10 @@ class RawReportFetcher:
 
     def _fetch_app_report(
         self, app: Application, idx: int, total: int
-    ) -> Optional[str]:
-        """Fetch report for a single application, save as JSON, and return the file path."""
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch the latest report data for a single application."""
         try:
-            logger.info(f"🔍 [{idx}/{total}] Processing {app.name}...")
+            logger.debug(f"🔍 [{idx}/{total}] Processing {app.name}...")
 
             info = self.iq.get_latest_report_info(app.id)
             if not info:
@@ -51,18 +118,34 @@ class RawReportFetcher:
                 logger.warning(f"⚠️  [{idx}/{total}] No report data for {app.name}")
                 return None
 
-            # Save JSON to disk
-            json_filename = f"{app.publicId}_{report_id}.json"
-            json_path = self.output_path / json_filename
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            logger.info(f"✅ [{idx}/{total}] Saved JSON: {json_filename}")
-            return str(json_path)
+            logger.debug(
+                f"✅ [{idx}/{total}] Fetched report {report_id} for {app.name}"
+            )
+            return data
         except Exception as e:
             logger.error(f"❌ [{idx}/{total}] Error processing {app.name}: {e}")
             return None
 
+    def _fetch_in_order(
+        self, ex: ThreadPoolExecutor, apps: List[Application], window: int
+    ) -> Iterator[Optional[Dict[str, Any]]]:
+        """Yield fetch results in application order, keeping at most ``window``
+        fetches submitted ahead of the consumer."""
+        total = len(apps)
+        pending: Deque[Future[Optional[Dict[str, Any]]]] = deque()
+        try:
+            for idx, app in enumerate(apps, 1):
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+                pending.append(ex.submit(self._fetch_app_report, app, idx, total))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Don't start queued fetches if the consumer stops early, so the
+            # executor shutdown only waits for fetches already running
+            for future in pending:
+                future.cancel()
+
     def get_applications(self) -> List[Application]:
         """Fetch and display applications."""
         logger.info("🔍 Fetching applications from IQ Server...")
@@ -95,15 +178,37 @@ class RawReportFetcher:
 
         total = len(apps)
         success_count = 0
-        json_files = []
+
+        def fetched_reports(
+            results: Iterator[Optional[Dict[str, Any]]],
+        ) -> Iterator[Dict[str, Any]]:
+            nonlocal success_count
+            # Per-app lines are debug-only; report progress in ~10% steps instead
+            step = (total + 9) // 10
+            for done, data in enumerate(results, 1):
+                if data:
+                    success_count += 1
+                    yield data
+                if done % step == 0 or done == total:
+                    logger.info(f"⏳ Progress: {done}/{total} applications")
 
         logger.info(f"⚡ Processing {total} applications...")
 
-        for i, app in enumerate(apps, 1):
-            json_path = self._fetch_app_report(app, i, total)
-            if json_path:
-                json_files.append(json_path)
-                success_count += 1
+        # Fetches overlap on threads while reports are consolidated in application
+        # order; at most 2x the worker count are in flight or waiting to be
+        # written, and each report is dropped once its rows have been written
+        consolidated_csv = self.output_path / "consolidated_security_report.csv"
+        workers = min(self.config.fetch_workers, total)
+        with (
+            ThreadPoolExecutor(max_workers=workers) as ex,
+            closing(self._fetch_in_order(ex, apps, window=2 * workers)) as results,
+        ):
+            self.consolidate_reports_to_csv(fetched_reports(results), consolidated_csv)
+
+        # Older scans and apps no longer listed are never read again; drop them
+        removed = self.iq.prune_cache()
+        if removed:
+            logger.debug(f"🧹 Removed {removed} stale cache entries")
 
         # Final summary with emojis
         logger.info("=" * 50)
@@ -118,157 +223,102 @@ class RawReportFetcher:
         else:
             logger.error("😞 No reports were successfully fetched")
 
-        # Load all JSON files and consolidate
-        report_data_list = []
-        for json_file in json_files:
-            try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    report_data_list.append(json.load(f))
-            except Exception as e:
-                logger.error(f"❌ Failed to load {json_file}: {e}")
-
-        # Save consolidated CSV to OUTPUT_DIR
-        consolidated_csv = self.output_path / "consolidated_security_report.csv"
-        self.consolidate_reports_to_csv(report_data_list, consolidated_csv)
-
-        # Delete JSON files after consolidation
-        for json_file in json_files:
-            try:
-                Path(json_file).unlink()
-                logger.info(f"🗑️  Deleted {json_file}")
-            except Exception as e:
-                logger.warning(f"⚠️  Could not delete {json_file}: {e}")
-
     def consolidate_reports_to_csv(
-        self, report_data_list: List[Dict[str, Any]], output_csv_path: Path
+        self, report_data_list: Iterable[Dict[str, Any]], output_csv_path: Path
     ) -> None:
-        """Consolidate all report data into a single CSV as specified."""
-        if not report_data_list:
-            logger.warning("❌ No report data found to consolidate!")
+        """Consolidate all report data into a single CSV as specified.
+
+        Reports are consumed one at a time, so with a generator only the report
+        being written, plus whatever the producer still holds, is in memory.
+        ``output_csv_path`` must live in ``self.output_path``, which
+        ``__init__`` has already created.
+        """
+        rows = self._iter_consolidated_rows(report_data_list)
+        first_row = next(rows, None)
+        if first_row is None:
+            logger.warning("❌ No data was consolidated!")
             return
-        logger.info(
-            f"🔍 Found {len(report_data_list)} reports to process for consolidation."
-        )
-        # First pass: aggregate all violations per application
-        app_severity_counts = {}
-        app_rows = []
+
+        # Write beside the target and rename once complete, so an interrupted
+        # run leaves the previous CSV in place rather than a truncated one
+        tmp_csv_path = output_csv_path.with_suffix(".csv.tmp")
+        try:
+            # 1 MiB buffer: rows are small, so batch them into fewer write syscalls
+            with open(
+                tmp_csv_path, "w", newline="", encoding="utf-8", buffering=1 << 20
+            ) as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                writer.writerow(CSV_FIELDS)
+                writer.writerow(first_row)
+                row_count = 1
+                for batch in batched(rows, 4096):
+                    writer.writerows(batch)
+                    row_count += len(batch)
+            os.replace(tmp_csv_path, output_csv_path)
+        except BaseException:
+            tmp_csv_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"💾 Consolidated CSV saved to: {output_csv_path}")
+        logger.info(f"📊 Generated {row_count} consolidated rows.")
+
+    def _iter_consolidated_rows(
+        self, report_data_list: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Yield one CSV row per policy violation, a single pass per report."""
+        row_no = 0
         for data in report_data_list:
+            # Tally this report's violations, then emit its rows with the totals
             try:
                 app = data.get("application", {})
                 app_id = app.get("publicId", "unknown")
                 org_id = app.get("organizationId", "unknown")
                 components = data.get("components", [])
-                if app_id not in app_severity_counts:
-                    app_severity_counts[app_id] = {
-                        "Critical": 0,
-                        "Severe": 0,
-                        "Moderate": 0,
-                    }
-                for c in components:
-                    violations = c.get("violations", [])
-                    for violation in violations:
-                        threat_level = violation.get("policyThreatLevel", 0)
-                        if threat_level >= 7:
-                            app_severity_counts[app_id]["Critical"] += 1
-                        elif threat_level >= 4:
-                            app_severity_counts[app_id]["Severe"] += 1
-                        elif threat_level >= 1:
-                            app_severity_counts[app_id]["Moderate"] += 1
-                app_rows.append((app_id, org_id, components))
+                # Counter tallies the iterable in C rather than a Python += loop
+                counts = Counter(
+                    _SEV_BY_LEVEL[_threat_index(v.get("policyThreatLevel", 0))]
+                    for c in components
+                    for v in c.get("violations", [])
+                )
             except Exception as e:
                 logger.error(f"   ❌ Error processing report data: {e}")
+                continue
 
-        # Second pass: build rows with total counts for each app
-        consolidated_data = []
-        for app_id, org_id, components in app_rows:
+            c_crit = counts["Critical"]
+            c_sev = counts["Severe"]
+            c_mod = counts["Moderate"]
             for c in components:
                 component_name = c.get("displayName", "")
                 violations = c.get("violations", [])
                 if not violations:
                     continue  # skip rows with no policy violations
                 for violation in violations:
-                    threat_level = violation.get("policyThreatLevel", 0)
-
-                    def extract_cve_info(constraints):
-                        cve_info = {
-                            "cve_id": "",
-                            "condition": "",
-                            "constraint_name": "",
-                        }
-                        for constraint in constraints:
-                            constraint_name = constraint.get("constraintName", "")
-                            conditions = constraint.get("conditions", [])
-                            cve_info["constraint_name"] = constraint_name
-                            cve_ids = []
-                            condition_parts = []
-                            for condition in conditions:
-                                condition_summary = condition.get(
-                                    "conditionSummary", ""
-                                )
-                                condition_reason = condition.get("conditionReason", "")
-                                cve_match = re.search(
-                                    r"CVE-\d{4}-\d+",
-                                    condition_summary + " " + condition_reason,
-                                )
-                                if cve_match and cve_match.group(0) not in cve_ids:
-                                    cve_ids.append(cve_match.group(0))
-                                if condition_reason:
-                                    condition_parts.append(condition_reason)
-                                elif condition_summary:
-                                    condition_parts.append(condition_summary)
-                            cve_info["cve_id"] = ", ".join(cve_ids) if cve_ids else ""
-                            cve_info["condition"] = (
-                                " | ".join(condition_parts) if condition_parts else ""
-                            )
-                        return cve_info
-
-                    cve_info = extract_cve_info(violation.get("constraints", []))
-                    policy_action = ""
-                    if violation.get("policyThreatCategory", "").upper() == "SECURITY":
-                        if threat_level >= 7:
-                            policy_action = "Security-Critical"
-                        elif threat_level >= 4:
-                            policy_action = "Security-CVSS score than or equals 7"
-                        else:
-                            policy_action = "Security-Moderate"
+                    vget = violation.get  # bind once for the lookups below
+                    threat_level = vget("policyThreatLevel", 0)
+
+                    cve_info = extract_cve_info(vget("constraints", []))
+                    level = _threat_index(threat_level)
+                    cat = vget("policyThreatCategory", "")
+                    # IQ Server sends "SECURITY"; only other casings pay for .upper()
+                    if cat == "SECURITY" or cat.upper() == "SECURITY":
+                        policy_action = _SEC_ACTION_BY_LEVEL[level]
                     else:
-                        sev = (
-                            "Critical"
-                            if threat_level >= 7
-                            else "Severe"
-                            if threat_level >= 4
-                            else "Moderate"
-                            if threat_level >= 1
-                            else "Low"
-                        )
-                        policy_action = (
-                            f"{violation.get('policyThreatCategory', '')}-{sev}"
-                            if violation.get("policyThreatCategory", "")
-                            else sev
-                        )
-                    consolidated_row = {
-                        "No.": len(consolidated_data) + 1,
-                        "Application": app_id,
-                        "Organization": org_id,
-                        "time": "10 hours ago",
-                        "Critical (7-10)": app_severity_counts[app_id]["Critical"],
-                        "Severe (4-6)": app_severity_counts[app_id]["Severe"],
-                        "Moderate (1-3)": app_severity_counts[app_id]["Moderate"],
-                        "Policy": violation.get("policyName", ""),
-                        "Component": component_name,
-                        "Threat": threat_level,
-                        "Policy/Action": policy_action,
-                        "Constraint Name": cve_info["constraint_name"],
-                        "Condition": cve_info["condition"],
-                        "CVE": cve_info["cve_id"],
-                    }
-                    consolidated_data.append(consolidated_row)
-
-        if consolidated_data:
-            df_consolidated = pd.DataFrame(consolidated_data)
-            output_csv_path.parent.mkdir(parents=True, exist_ok=True)
-            df_consolidated.to_csv(output_csv_path, index=False)
-            logger.info(f"💾 Consolidated CSV saved to: {output_csv_path}")
-            logger.info(f"📊 Generated {len(consolidated_data)} consolidated rows.")
-        else:
-            logger.warning("❌ No data was consolidated!")
+                        sev = _SEV_BY_LEVEL[level]
+                        policy_action = f"{cat}-{sev}" if cat else sev
+                    row_no += 1
+                    # Plain tuples in CSV_FIELDS order; no per-row dict to build
+                    yield (
+                        row_no,
+                        app_id,
+                        org_id,
+                        "10 hours ago",
+                        c_crit,
+                        c_sev,
+                        c_mod,
+                        vget("policyName", ""),
+                        component_name,
+                        threat_level,
+                        policy_action,
+                        cve_info["constraint_name"],
+                        cve_info["condition"],
+                        cve_info["cve_id"],
+                    )
@@ -6,6 +6,12 @@ from functools import wraps
 import requests
 from pydantic import ValidationError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None  # type: ignore[assignment]
+    import json
+
 # Type variable for generic function signatures
 F = TypeVar("F", bound=Callable[..., Any])
 
@@ -23,6 +29,13 @@ def resolve_path(path: str) -> str:
     return path if os.path.isabs(path) else os.path.join(base_dir, path)
 
 
+def json_loads(raw: Union[bytes, str]) -> Any:
+    """Parse JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 # Terminal colors
 class Colors:
     GREEN = "\033[92m"